@@ -4,20 +4,202 @@ Pinterest Skincare Affiliate Automation Script
 Automates daily Pinterest posts for trending skincare products with Amazon affiliate links
 """
 
+import httpx
 import requests
-from bs4 import BeautifulSoup
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+import numpy as np
+import hashlib
+import io
 import random
+import re
 from datetime import datetime
+from pathlib import Path
 import json
 import os
+import sqlite3
+import sys
+import time
 
 # Configuration
 AMAZON_AFFILIATE_TAG = "wellnesslabco-20"
 PINTEREST_IMAGE_SIZE = (1000, 1500)  # 2:3 ratio optimal for Pinterest
 OUTPUT_DIR = os.getcwd()  # FIXED: Use current directory instead of hardcoded path
 
+# Scraped bestseller lists are reused for a day (set SCRAPE_AMAZON_BESTSELLERS=1 to enable)
+BESTSELLERS_CACHE_DB = os.path.join(OUTPUT_DIR, '_bestsellers_cache.db')
+BESTSELLERS_CACHE_TTL = 24 * 60 * 60
+
+# Shared template description - only the product name changes per pin
+DESCRIPTION_TEMPLATE = """{name} - Your New Skincare Essential
+
+Transform your routine with this trending skincare product that's taking 2026 by storm.
+
+✨ WHY SKINCARE LOVERS ARE OBSESSED:
+• Science-backed formula with proven results
+• Addresses multiple skin concerns
+• Suitable for all skin types
+• Visible improvement in just weeks
+
+💡 TRENDING INGREDIENT SPOTLIGHT:
+This product features cutting-edge actives that dermatologists are raving about in 2026.
+
+👉 Tap the link to shop and transform your skincare routine!
+
+#KBeauty #Skincare #SkincareRoutine #BeautyFinds #GlowySkin #SkincareAddict #HealthySkin #SkincareTips #AntiAging #BeautyDeals #SkincareObsessed #GlassKin #SkinGoals #BeautyMustHaves"""
+
+# Pin background colors - one pre-rendered template per color, built on first use
+BACKGROUND_COLORS = [
+    '#FFE5E5',  # Soft pink
+    '#E5F3FF',  # Soft blue
+    '#FFF5E5',  # Soft peach
+    '#F0E5FF',  # Soft purple
+]
+_PALETTE = [ImageColor.getrgb(c) for c in BACKGROUND_COLORS]
+
+# Encode buffers that grew past this are replaced rather than reused
+ENCODE_BUFFER_CAP = 128 * 1024
+
+# Bump the version suffix whenever the static template layout changes (git-ignored)
+TEMPLATE_CACHE_DIR = os.path.join(OUTPUT_DIR, '.template_cache_v1')
+
+# Font candidates per platform (Linux, macOS, Windows), first existing file wins
+BOLD_FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/System/Library/Fonts/Supplemental/Arial Bold.ttf',
+    '/Library/Fonts/Arial Bold.ttf',
+    'C:/Windows/Fonts/arialbd.ttf',
+]
+REGULAR_FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/Library/Fonts/Arial.ttf',
+    'C:/Windows/Fonts/arial.ttf',
+]
+
+
+def _resolve_font_path(candidates):
+    """Return the first font file that exists, or None"""
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+BOLD_FONT_PATH = _resolve_font_path(BOLD_FONT_CANDIDATES)
+REGULAR_FONT_PATH = _resolve_font_path(REGULAR_FONT_CANDIDATES)
+
+# Loaded fonts keyed by (path, size) - FreeType face construction is expensive
+_FONT_CACHE = {}
+
+
+def _get_font(path, size):
+    """Return a cached TrueType font, loading it on first use"""
+    key = (path, size)
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        # Layout and measuring need a TrueType font - Pillow's bitmap default can't do either
+        if path is None:
+            print("❌ ERROR: No TrueType font found!")
+            print("Install DejaVu Sans (e.g. apt-get install fonts-dejavu-core) or Arial")
+            sys.exit(1)
+        font = ImageFont.truetype(path, size)
+        _FONT_CACHE[key] = font
+    return font
+
+
+def _break_word(word, font, max_width_px):
+    """Split a word wider than max_width_px into fitting chunks, preferring breaks after '-' or '/'"""
+    chunks = []
+    current = ''
+    for part in re.findall(r'[^-/]*[-/]|[^-/]+', word):
+        if font.getlength(current + part) <= max_width_px:
+            current += part
+            continue
+        if current:
+            chunks.append(current)
+        # Part doesn't fit next to the previous one - fall back to character breaks
+        current = ''
+        for char in part:
+            if current and font.getlength(current + char) > max_width_px:
+                chunks.append(current)
+                current = char
+            else:
+                current += char
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _layout_title(text, font, max_width_px, spacing=4):
+    """Greedy-wrap text to a pixel width, returning (wrapped_text, width_px, height_px)"""
+    space_width = font.getlength(' ')
+    lines = []
+    line_widths = []
+    current = []
+    current_width = 0
+
+    for word in text.split():
+        word_width = font.getlength(word)
+        if word_width > max_width_px:
+            if current:
+                lines.append(' '.join(current))
+                line_widths.append(current_width)
+            *full_chunks, last_chunk = _break_word(word, font, max_width_px)
+            for chunk in full_chunks:
+                lines.append(chunk)
+                line_widths.append(font.getlength(chunk))
+            current = [last_chunk]
+            current_width = font.getlength(last_chunk)
+            continue
+
+        new_width = current_width + space_width + word_width if current else word_width
+        if current and new_width > max_width_px:
+            lines.append(' '.join(current))
+            line_widths.append(current_width)
+            current = [word]
+            current_width = word_width
+        else:
+            current.append(word)
+            current_width = new_width
+
+    if current:
+        lines.append(' '.join(current))
+        line_widths.append(current_width)
+
+    ascent, descent = font.getmetrics()
+    height = len(lines) * (ascent + descent) + max(len(lines) - 1, 0) * spacing
+
+    return '\n'.join(lines), int(max(line_widths, default=0)), height
+
+
+def _parse_bestsellers(html):
+    """Extract unique ASINs and product names from a bestsellers page"""
+    # Imported here so the opt-in scraper can't break the default path
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    bestsellers = []
+    seen = set()
+
+    for node in tree.css('[data-asin]'):
+        asin = node.attributes.get('data-asin')
+        if not asin or asin in seen:
+            continue
+
+        name_node = node.css_first('div._cDEzb_p13n-sc-css-line-clamp-3_g3dy1') or node.css_first('img[alt]')
+        if name_node is None:
+            continue
+        name = name_node.text(strip=True) or name_node.attributes.get('alt', '')
+        if not name:
+            continue
+
+        seen.add(asin)
+        # Everything on the live list is a current bestseller
+        bestsellers.append({"asin": asin, "name": name, "trending": True})
+
+    return bestsellers
+
+
 class SkincareAffiliateBot:
 
     def __init__(self):
@@ -27,6 +209,15 @@ class SkincareAffiliateBot:
             "collagen", "ceramides", "snail mucin"
         ]
 
+        # Reusable pixel buffer for background fills, allocated on first template render
+        self._bg_buf = None
+        self._templates = {}
+
+        # Canvas and JPEG buffer reused for every image this bot generates
+        self._canvas = Image.new('RGB', PINTEREST_IMAGE_SIZE, 'white')
+        self._draw = ImageDraw.Draw(self._canvas)
+        self._encode_buf = io.BytesIO()
+
     def get_amazon_bestsellers(self, category_url="https://www.amazon.com/Best-Sellers-Beauty-Personal-Care-Facial-Skin-Care-Products/zgbs/beauty/11060711"):
         """
         Scrape Amazon bestsellers in skincare category
@@ -34,6 +225,12 @@ class SkincareAffiliateBot:
         """
         print("🔍 Fetching Amazon bestsellers...")
 
+        if os.getenv('SCRAPE_AMAZON_BESTSELLERS') == '1':
+            bestsellers = self._fetch_bestsellers(category_url)
+            if bestsellers:
+                return bestsellers
+            print("⚠️  No products scraped - using example bestsellers")
+
         # Note: In production, you'd want to use Amazon Product Advertising API
         # For now, returning example bestseller ASINs to demonstrate workflow
 
@@ -47,6 +244,45 @@ class SkincareAffiliateBot:
 
         return bestsellers
 
+    def _fetch_bestsellers(self, category_url):
+        """Scrape a bestsellers page, served from the SQLite cache while it is fresh"""
+        conn = sqlite3.connect(BESTSELLERS_CACHE_DB)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (url TEXT PRIMARY KEY, fetched_at INTEGER, payload TEXT)")
+            row = conn.execute("SELECT payload, fetched_at FROM cache WHERE url=?", (category_url,)).fetchone()
+
+            now = int(time.time())
+            if row and now - row[1] < BESTSELLERS_CACHE_TTL:
+                print("✅ Using cached bestsellers")
+                return json.loads(row[0])
+
+            try:
+                response = httpx.get(
+                    category_url,
+                    headers={
+                        "Accept-Encoding": "gzip",
+                        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)"
+                    },
+                    follow_redirects=True,
+                    timeout=10.0
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"⚠️  Bestsellers fetch failed: {e}")
+                # A stale list beats no list
+                return json.loads(row[0]) if row else []
+
+            bestsellers = _parse_bestsellers(response.text)
+            if bestsellers:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache (url, fetched_at, payload) VALUES (?, ?, ?)",
+                        (category_url, now, json.dumps(bestsellers))
+                    )
+            return bestsellers
+        finally:
+            conn.close()
+
     def check_trending_match(self, product_name):
         """Check if product matches trending ingredients"""
         product_lower = product_name.lower()
@@ -69,40 +305,42 @@ class SkincareAffiliateBot:
         # Fallback to first bestseller
         return bestsellers[0]
 
-    def generate_pinterest_image(self, product_info, output_path):
-        """Create Pinterest-optimized product image"""
-        print("🎨 Creating Pinterest-optimized image...")
-
-        width, height = PINTEREST_IMAGE_SIZE
-
-        # Create base image with aesthetic background
-        colors = [
-            '#FFE5E5',  # Soft pink
-            '#E5F3FF',  # Soft blue
-            '#FFF5E5',  # Soft peach
-            '#F0E5FF',  # Soft purple
-        ]
-        bg_color = random.choice(colors)
-        img = Image.new('RGB', (width, height), color=bg_color)
+    def _get_template(self, bg_color):
+        """Return the static template for a background color, loading or rendering it on first use"""
+        template = self._templates.get(bg_color)
+        if template is not None:
+            return template
+
+        # The resolved font is part of the key so a fallback-font render never outlives a font fix
+        font_key = hashlib.sha1(str(REGULAR_FONT_PATH).encode()).hexdigest()[:8]
+        cache_path = os.path.join(TEMPLATE_CACHE_DIR, '{:02X}{:02X}{:02X}_{}.png'.format(*bg_color, font_key))
+
+        if os.path.exists(cache_path):
+            with Image.open(cache_path) as cached:
+                template = cached.convert('RGB')
+        else:
+            template = self._render_template(bg_color)
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            template.save(cache_path, 'PNG')
+
+        self._templates[bg_color] = template
+        return template
+
+    def _make_bg(self, bg_color):
+        """Broadcast-fill the background buffer with an RGB color and return it as an image"""
+        if self._bg_buf is None:
+            width, height = PINTEREST_IMAGE_SIZE
+            self._bg_buf = np.empty((height, width, 3), dtype=np.uint8)  # rows, columns, RGB
+        np.copyto(self._bg_buf, np.array(bg_color, dtype=np.uint8))
+        return Image.fromarray(self._bg_buf, 'RGB')
+
+    def _render_template(self, bg_color):
+        """Render the parts of a pin that never change: background, benefits and CTA"""
+        width = PINTEREST_IMAGE_SIZE[0]
+
+        img = self._make_bg(bg_color)
         draw = ImageDraw.Draw(img)
-
-        # Load fonts
-        try:
-            title_font = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejavuSans-Bold.ttf', 60)
-            subtitle_font = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejavuSans.ttf', 40)
-            small_font = ImageFont.truetype('/usr/share/fonts/truetype/dejavu/DejavuSans.ttf', 30)
-        except:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-
-        # Add product name
-        product_name = product_info['name']
-        wrapped_name = textwrap.fill(product_name, width=20)
-        title_bbox = draw.multiline_textbbox((0, 0), wrapped_name, font=title_font, align='center')
-        title_width = title_bbox[2] - title_bbox[0]
-        title_x = (width - title_width) // 2
-        draw.multiline_text((title_x, 100), wrapped_name, fill='#2C2C2C', font=title_font, align='center')
+        subtitle_font = _get_font(REGULAR_FONT_PATH, 40)
 
         # Add benefits (would be customized per product in full version)
         benefits = [
@@ -125,32 +363,49 @@ class SkincareAffiliateBot:
         draw.rectangle([cta_x - 20, 1350, cta_x + cta_width + 20, 1420], fill='#FF6B9D')
         draw.text((cta_x, 1360), cta, fill='white', font=subtitle_font)
 
-        # Save
-        img.save(output_path, 'JPEG', quality=95)
-        print(f"✅ Image saved: {output_path}")
+        return img
 
-        return output_path
+    def generate_pinterest_image(self, product_info, output_path):
+        """Create Pinterest-optimized product image"""
+        print("🎨 Creating Pinterest-optimized image...")
 
-    def generate_description(self, product_info):
-        """Generate science-backed Pinterest description"""
-        print("✍️ Generating optimized description...")
+        width = PINTEREST_IMAGE_SIZE[0]
 
-        description = f"""{product_info['name']} - Your New Skincare Essential
+        # Reset the canvas to the pre-rendered template for today's background -
+        # seeding on the date keeps re-runs on the same day identical
+        rng = random.Random(datetime.now().strftime('%Y%m%d'))
+        bg_color = rng.choice(_PALETTE)
+        self._canvas.paste(self._get_template(bg_color))
 
-Transform your routine with this trending skincare product that's taking 2026 by storm.
+        title_font = _get_font(BOLD_FONT_PATH, 60)
 
-✨ WHY SKINCARE LOVERS ARE OBSESSED:
-• Science-backed formula with proven results
-• Addresses multiple skin concerns
-• Suitable for all skin types
-• Visible improvement in just weeks
+        # Add product name
+        product_name = product_info['name']
+        wrapped_name, title_width, _ = _layout_title(product_name, title_font, width - 200)
+        title_x = max((width - title_width) // 2, 0)
+        self._draw.multiline_text((title_x, 100), wrapped_name, fill='#2C2C2C', font=title_font, align='center')
+
+        # Save - Pinterest re-encodes anyway, so q85 is visually identical at a fraction of the size
+        self._canvas.save(self._encode_buf, 'JPEG', quality=85, optimize=True, progressive=True, subsampling=2)
+        # Write straight from the buffer; the view must be released before the buffer can be truncated
+        with self._encode_buf.getbuffer() as view:
+            Path(output_path).write_bytes(view)
+
+        if self._encode_buf.tell() > ENCODE_BUFFER_CAP:
+            self._encode_buf = io.BytesIO()
+        else:
+            self._encode_buf.seek(0)
+            self._encode_buf.truncate(0)
 
-💡 TRENDING INGREDIENT SPOTLIGHT:
-This product features cutting-edge actives that dermatologists are raving about in 2026.
+        print(f"✅ Image saved: {output_path}")
 
-👉 Tap the link to shop and transform your skincare routine!
+        return output_path
 
-#KBeauty #Skincare #SkincareRoutine #BeautyFinds #GlowySkin #SkincareAddict #HealthySkin #SkincareTips #AntiAging #BeautyDeals #SkincareObsessed #GlassKin #SkinGoals #BeautyMustHaves"""
+    def generate_description(self, product_info):
+        """Generate science-backed Pinterest description"""
+        print("✍️ Generating optimized description...")
+
+        description = DESCRIPTION_TEMPLATE.format(name=product_info['name'])
 
         return description
 
@@ -174,16 +429,15 @@ This product features cutting-edge actives that dermatologists are raving about
         # Generate description
         description = self.generate_description(product)
         desc_path = f"{OUTPUT_DIR}/description_{timestamp}.txt"
-        with open(desc_path, 'w') as f:
-            f.write(description)
 
         # Generate affiliate link
         affiliate_link = self.generate_affiliate_link(product['asin'])
         link_path = f"{OUTPUT_DIR}/link_{timestamp}.txt"
-        with open(link_path, 'w') as f:
-            f.write(f"Affiliate Link: {affiliate_link}\n")
-            f.write(f"Product: {product['name']}\n")
-            f.write(f"ASIN: {product['asin']}\n")
+        link_text = (
+            f"Affiliate Link: {affiliate_link}\n"
+            f"Product: {product['name']}\n"
+            f"ASIN: {product['asin']}\n"
+        )
 
         # Save post info
         post_info = {
@@ -196,8 +450,11 @@ This product features cutting-edge actives that dermatologists are raving about
         }
 
         info_path = f"{OUTPUT_DIR}/post_info_{timestamp}.json"
-        with open(info_path, 'w') as f:
-            json.dump(post_info, f, indent=2)
+
+        # Each output is built in memory and written in a single call
+        Path(desc_path).write_text(description, encoding='utf-8')
+        Path(link_path).write_text(link_text, encoding='utf-8')
+        Path(info_path).write_text(json.dumps(post_info, indent=2), encoding='utf-8')
 
         print("\n✅ DAILY POST READY!")
         print(f"📁 Image: {image_path}")
@@ -6,20 +6,41 @@ Enhanced Pinterest API Bot with:
 - Claude AI-generated unique descriptions
 """
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import sys
 import argparse
+import hashlib
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 # Import existing automation
 import pinterest_automation as automation
 
+# Claude description settings - bump PROMPT_VERSION when the prompt changes
+CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+PROMPT_VERSION = 1
+DESCRIPTION_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+
+# Generated images are committed to the repo root and served by GitHub Pages
+PAGES_BASE_URL = "https://wellnesslabco.github.io"
+
+# KEY=value lines in .env; comments and blank lines never match the anchored pattern
+_ENV_RE = re.compile(r'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)=(.*)$', re.M)
+
 class EnhancedPinterestBot:
     """Pinterest bot with product tagging and AI descriptions"""
 
+    # Set once .env has been loaded into os.environ for this process
+    _env_loaded = False
+
     def __init__(self):
         self.load_credentials()
         self.base_url = "https://api.pinterest.com/v5"
@@ -28,24 +49,58 @@ class EnhancedPinterestBot:
             "Content-Type": "application/json"
         }
         self.output_dir = os.getcwd()
+        self.desc_cache_dir = Path(self.output_dir) / '.desc_cache'
+        self._board_cache = Path(self.output_dir) / '.board_cache.json'
+
+        # One pooled keep-alive session per host
+        self.http = self._make_session(self.headers)
+        self.upload_http = self._make_session()
+
+        # Claude client, created on the first AI description
+        self.anthropic = None
+
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.http.close()
+        self.upload_http.close()
+        if self.anthropic is not None:
+            self.anthropic.close()
+
+    @staticmethod
+    def _make_session(headers=None):
+        """Create a requests session with connection pooling and retries"""
+        session = requests.Session()
+        if headers:
+            session.headers.update(headers)
+        session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            # Hand the last response back to the caller instead of raising RetryError
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        ))
+        return session
 
     def load_credentials(self):
         """Load API credentials"""
-        env_file = ".env"
-
-        if not os.path.exists(env_file):
-            print("❌ ERROR: .env file not found!")
-            print("\n📋 Please create .env with:")
-            print("PINTEREST_ACCESS_TOKEN=your_token")
-            print("AMAZON_AFFILIATE_TAG=wellnesslabco-20")
-            print("ANTHROPIC_API_KEY=your_claude_key (optional for AI descriptions)")
-            sys.exit(1)
+        env_file = Path(".env")
 
-        with open(env_file, 'r') as f:
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    os.environ[key] = value
+        if not EnhancedPinterestBot._env_loaded:
+            if not env_file.exists():
+                print("❌ ERROR: .env file not found!")
+                print("\n📋 Please create .env with:")
+                print("PINTEREST_ACCESS_TOKEN=your_token")
+                print("AMAZON_AFFILIATE_TAG=wellnesslabco-20")
+                print("ANTHROPIC_API_KEY=your_claude_key (optional for AI descriptions)")
+                sys.exit(1)
+
+            for m in _ENV_RE.finditer(env_file.read_text()):
+                os.environ[m.group(1)] = m.group(2).strip()
+            EnhancedPinterestBot._env_loaded = True
 
         self.access_token = os.getenv('PINTEREST_ACCESS_TOKEN')
         self.anthropic_key = os.getenv('ANTHROPIC_API_KEY', None)
@@ -66,18 +121,39 @@ class EnhancedPinterestBot:
             print("⚠️  No Claude API key - using template description")
             return self.generate_template_description(product_info)
 
+        # Re-posts and retries of the same product reuse the cached description
+        key = hashlib.sha1(f"{product_info['asin']}|{CLAUDE_MODEL}|{PROMPT_VERSION}".encode()).hexdigest()
+        cache_path = self.desc_cache_dir / f"{key}.txt"
+        # Any error reading or expiring the entry just counts as a cache miss
+        try:
+            if time.time() - os.path.getmtime(cache_path) < DESCRIPTION_CACHE_TTL:
+                description = cache_path.read_text(encoding='utf-8')
+                print("✅ Using cached AI description")
+                return description
+            cache_path.unlink()
+        except OSError:
+            pass
+
         print("🤖 Generating AI-powered description with Claude...")
 
         try:
-            response = requests.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.anthropic_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
+            # Claude calls share one multiplexed HTTP/2 connection
+            if self.anthropic is None:
+                self.anthropic = httpx.Client(
+                    base_url="https://api.anthropic.com",
+                    headers={
+                        "x-api-key": self.anthropic_key,
+                        "anthropic-version": "2023-06-01",
+                        "content-type": "application/json"
+                    },
+                    transport=httpx.HTTPTransport(http2=True, retries=3),
+                    timeout=30.0
+                )
+
+            response = self.anthropic.post(
+                "/v1/messages",
                 json={
-                    "model": "claude-3-5-sonnet-20241022",
+                    "model": CLAUDE_MODEL,
                     "max_tokens": 1024,
                     "messages": [{
                         "role": "user",
@@ -98,50 +174,102 @@ Write ONLY the Pinterest description, nothing else."""
                 }
             )
 
-            if response.status_code == 200:
-                description = response.json()['content'][0]['text']
-                print("✅ AI description generated!")
-                return description
-            else:
+            if response.status_code != 200:
                 print(f"⚠️  Claude API error: {response.status_code}")
                 return self.generate_template_description(product_info)
 
+            description = response.json()['content'][0]['text']
+            print("✅ AI description generated!")
+
         except Exception as e:
             print(f"⚠️  Error calling Claude API: {e}")
             return self.generate_template_description(product_info)
 
-    def generate_template_description(self, product_info):
-        """Fallback template description"""
-        return f"""✨ {product_info['name']} - Your New Skincare Essential
-
-Transform your routine with this trending product that's taking 2026 by storm.
-
-💫 WHY SKINCARE LOVERS ARE OBSESSED:
-• Science-backed formula with proven results
-• Addresses multiple skin concerns
-• Suitable for all skin types
-• Visible improvement in just weeks
+        # Caching is best effort - a disk error must not discard a good description
+        try:
+            self.desc_cache_dir.mkdir(exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            tmp_path.write_text(description, encoding='utf-8')
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not cache AI description: {e}")
 
-👉 Tap the link to shop and transform your skincare routine!
+        return description
 
-#KBeauty #Skincare #SkincareRoutine #BeautyFinds #GlowingSkin #SkincareAddict #HealthySkin #SkincareTips #BeautyDeals"""
+    def generate_template_description(self, product_info):
+        """Fallback template description"""
+        return automation.DESCRIPTION_TEMPLATE.format(name=product_info['name'])
 
     def get_or_create_board(self, board_name="Skincare Must Haves"):
-        """Use hardcoded board ID from environment variable"""
-        print(f"📌 Using board ID: {self.board_id}")
-        return self.board_id
+        """Resolve the board ID from the environment, using the on-disk cache for slugs"""
+        # Numeric IDs can be used directly
+        if self.board_id.isdigit():
+            print(f"📌 Using board ID: {self.board_id}")
+            return self.board_id
+
+        cache = self._load_board_cache()
+        if self.board_id in cache:
+            print(f"📌 Using cached board ID: {cache[self.board_id]}")
+            return cache[self.board_id]
+
+        # "username/board-slug" style value - look the board up once and remember it
+        board_id = self._lookup_board_id(board_name)
+        if not board_id:
+            print(f"⚠️  Board '{self.board_id}' not found - using it as-is")
+            return self.board_id
+
+        cache[self.board_id] = board_id
+        self._board_cache.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+        print(f"📌 Resolved board ID: {board_id}")
+        return board_id
+
+    def _load_board_cache(self):
+        """Return the cached board slug -> ID mapping"""
+        try:
+            return json.loads(self._board_cache.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def invalidate_board_cache(self):
+        """Drop the cached ID for the configured board, returning True if there was one"""
+        cache = self._load_board_cache()
+        if cache.pop(self.board_id, None) is None:
+            return False
+        self._board_cache.write_text(json.dumps(cache, indent=2), encoding='utf-8')
+        return True
+
+    def _lookup_board_id(self, board_name):
+        """Page through the account's boards for one matching the configured slug or name"""
+        slug = self.board_id.rsplit('/', 1)[-1].lower()
+        bookmark = None
+
+        while True:
+            params = {"page_size": 100}
+            if bookmark:
+                params["bookmark"] = bookmark
+
+            response = self.http.get(f"{self.base_url}/boards", params=params)
+            if response.status_code != 200:
+                print(f"⚠️  Board lookup failed: {response.text}")
+                return None
+
+            data = response.json()
+            for board in data.get('items', []):
+                name = board.get('name', '')
+                if name.lower().replace(' ', '-') == slug or name == board_name:
+                    return board['id']
+
+            bookmark = data.get('bookmark')
+            if not bookmark:
+                return None
 
     def upload_image_to_pinterest(self, image_path):
         """Upload image and return media ID"""
         print(f"📤 Uploading image...")
 
-        with open(image_path, 'rb') as f:
-            image_data = f.read()
-
         # Register upload
-        response = requests.post(
+        response = self.http.post(
             f"{self.base_url}/media",
-            headers=self.headers,
             json={"media_type": "image"}
         )
 
@@ -153,12 +281,17 @@ Transform your routine with this trending product that's taking 2026 by storm.
         upload_url = upload_data['upload_url']
         media_id = upload_data['media_id']
 
-        # Upload image
-        upload_response = requests.put(
-            upload_url,
-            data=image_data,
-            headers={"Content-Type": "image/jpeg"}
-        )
+        # Upload image (pre-signed URL on another host, so no Pinterest auth header).
+        # Passing the file handle streams it instead of reading it all into memory.
+        with open(image_path, 'rb') as f:
+            upload_response = self.upload_http.put(
+                upload_url,
+                data=f,
+                headers={
+                    "Content-Type": "image/jpeg",
+                    "Content-Length": str(os.path.getsize(image_path))
+                }
+            )
 
         if upload_response.status_code == 200:
             print(f"✅ Image uploaded: {media_id}")
@@ -167,13 +300,34 @@ Transform your routine with this trending product that's taking 2026 by storm.
             print(f"❌ Image upload failed: {upload_response.text}")
             return None
 
-    def create_pin_with_product_tag(self, board_id, title, description, affiliate_link, image_path, product_url):
-        """Create pin with product tagging and affiliate toggle enabled"""
-        print("📍 Creating pin with product tag and affiliate disclosure...")
+    def get_media_source(self, image_path):
+        """Return the pin media source, preferring the public GitHub Pages URL over an upload"""
+        public_url = f"{PAGES_BASE_URL}/{os.path.basename(image_path)}"
 
-        # Upload image
+        try:
+            # Plain call without the session's retries so a miss costs at most 1s
+            head = requests.head(public_url, timeout=1, allow_redirects=False)
+            if head.status_code == 200:
+                print(f"🌐 Using public image URL: {public_url}")
+                return {"source_type": "image_url", "url": public_url}
+        except requests.RequestException:
+            pass
+
+        # Not published yet - fall back to uploading the image bytes
         media_id = self.upload_image_to_pinterest(image_path)
         if not media_id:
+            return None
+
+        return {"source_type": "image_upload", "media_id": media_id}
+
+    def create_pin_with_product_tag(self, board_id, title, description, affiliate_link, image_path, product_url, media_source=None):
+        """Create pin with product tagging and affiliate toggle enabled"""
+        print("📍 Creating pin with product tag and affiliate disclosure...")
+
+        # Resolve image source unless the caller already did
+        if media_source is None:
+            media_source = self.get_media_source(image_path)
+        if not media_source:
             return False
 
         # Create pin with enhanced product data
@@ -182,19 +336,24 @@ Transform your routine with this trending product that's taking 2026 by storm.
             "title": title[:100],
             "description": description[:800],
             "link": affiliate_link,
-            "media_source": {
-                "source_type": "image_upload",
-                "media_id": media_id
-            },
+            "media_source": media_source,
             "dominant_color": "#FFE5E5",
         }
 
-        response = requests.post(
+        response = self.http.post(
             f"{self.base_url}/pins",
-            headers=self.headers,
             json=pin_data
         )
 
+        # A stale cached board ID gets one refresh and retry
+        if response.status_code == 404 and self.invalidate_board_cache():
+            print("⚠️  Board not found - refreshing cached board ID and retrying")
+            pin_data["board_id"] = self.get_or_create_board()
+            response = self.http.post(
+                f"{self.base_url}/pins",
+                json=pin_data
+            )
+
         if response.status_code == 201:
             pin_info = response.json()
             pin_url = f"https://www.pinterest.com/pin/{pin_info['id']}/"
@@ -219,54 +378,63 @@ Transform your routine with this trending product that's taking 2026 by storm.
         bot = automation.SkincareAffiliateBot()
         product = bot.select_daily_product()
 
-        # Generate image
-        timestamp = datetime.now().strftime('%Y%m%d')
-        image_path = f"{self.output_dir}/pinterest_{timestamp}_{product['asin']}.jpg"
-        bot.generate_pinterest_image(product, image_path)
+        # Board lookup, description and image source have no dependency on
+        # each other, so their network round trips run concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # In review mode, board and image work wait until the post is confirmed
+            board_future = executor.submit(self.get_or_create_board) if auto_post else None
+
+            # Generate AI description (or template)
+            if use_ai and self.anthropic_key:
+                desc_future = executor.submit(self.generate_ai_description, product)
+            else:
+                desc_future = None
+
+            # Generate image
+            timestamp = datetime.now().strftime('%Y%m%d')
+            image_path = f"{self.output_dir}/pinterest_{timestamp}_{product['asin']}.jpg"
+            bot.generate_pinterest_image(product, image_path)
+
+            media_future = executor.submit(self.get_media_source, image_path) if auto_post else None
+
+            description = desc_future.result() if desc_future else bot.generate_description(product)
+
+            # Create affiliate link
+            affiliate_link = f"https://www.amazon.com/dp/{product['asin']}/?tag={os.getenv('AMAZON_AFFILIATE_TAG', 'wellnesslabco-20')}"
+            product_url = f"https://www.amazon.com/dp/{product['asin']}/"
+
+            # Save files
+            desc_path = f"{self.output_dir}/description_{timestamp}.txt"
+            Path(desc_path).write_text(description, encoding='utf-8')
 
-        # Generate AI description (or template)
-        if use_ai and self.anthropic_key:
-            description = self.generate_ai_description(product)
-        else:
-            description = bot.generate_description(product)
-
-        # Create affiliate link
-        affiliate_link = f"https://www.amazon.com/dp/{product['asin']}/?tag={os.getenv('AMAZON_AFFILIATE_TAG', 'wellnesslabco-20')}"
-        product_url = f"https://www.amazon.com/dp/{product['asin']}/"
-
-        # Save files
-        desc_path = f"{self.output_dir}/description_{timestamp}.txt"
-        with open(desc_path, 'w') as f:
-            f.write(description)
-
-        print("\n" + "="*60)
-        print("📋 POST PREVIEW:")
-        print("="*60)
-        print(f"📦 Product: {product['name']}")
-        print(f"📸 Image: {image_path}")
-        print(f"🔗 Affiliate Link: {affiliate_link}")
-        print(f"\n📝 Description:\n{description[:300]}...")
-
-        if not auto_post:
             print("\n" + "="*60)
-            response = input("\n✨ Post this to Pinterest? (yes/no): ").strip().lower()
-            if response not in ['yes', 'y']:
-                print("❌ Post cancelled.")
-                return False
-
-        # Get board
-        board_id = self.get_or_create_board()
-
-        # Create pin with product tag
-        title = f"{product['name'][:80]}"
-        success = self.create_pin_with_product_tag(
-            board_id=board_id,
-            title=title,
-            description=description,
-            affiliate_link=affiliate_link,
-            image_path=image_path,
-            product_url=product_url
-        )
+            print("📋 POST PREVIEW:")
+            print("="*60)
+            print(f"📦 Product: {product['name']}")
+            print(f"📸 Image: {image_path}")
+            print(f"🔗 Affiliate Link: {affiliate_link}")
+            print(f"\n📝 Description:\n{description[:300]}...")
+
+            if not auto_post:
+                print("\n" + "="*60)
+                response = input("\n✨ Post this to Pinterest? (yes/no): ").strip().lower()
+                if response not in ['yes', 'y']:
+                    print("❌ Post cancelled.")
+                    return False
+                board_future = executor.submit(self.get_or_create_board)
+                media_future = executor.submit(self.get_media_source, image_path)
+
+            # Create pin with product tag
+            title = f"{product['name'][:80]}"
+            success = self.create_pin_with_product_tag(
+                board_id=board_future.result(),
+                title=title,
+                description=description,
+                affiliate_link=affiliate_link,
+                image_path=image_path,
+                product_url=product_url,
+                media_source=media_future.result()
+            )
 
         if success:
             self.save_posting_record(product, affiliate_link, timestamp)
@@ -279,24 +447,33 @@ Transform your routine with this trending product that's taking 2026 by storm.
             return False
 
     def save_posting_record(self, product, affiliate_link, timestamp):
-        """Save posting history"""
-        record_file = f"{self.output_dir}/posting_history.json"
+        """Append this post to the posting history (one JSON record per line)"""
+        record_file = Path(self.output_dir) / "posting_history.jsonl"
+        self._migrate_posting_history(record_file)
 
-        if os.path.exists(record_file):
-            with open(record_file, 'r') as f:
-                history = json.load(f)
-        else:
-            history = []
-
-        history.append({
+        record = {
             "date": timestamp,
             "product": product['name'],
             "asin": product['asin'],
             "affiliate_link": affiliate_link
-        })
+        }
 
-        with open(record_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        with open(record_file, 'a', encoding='utf-8', buffering=1 << 14) as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def _migrate_posting_history(self, record_file):
+        """One-shot conversion of the old posting_history.json list to JSONL"""
+        legacy_file = record_file.with_suffix('.json')
+        if record_file.exists() or not legacy_file.exists():
+            return
+
+        history = json.loads(legacy_file.read_text(encoding='utf-8'))
+        record_file.write_text(
+            ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in history),
+            encoding='utf-8'
+        )
+        legacy_file.unlink()
+        print(f"📦 Migrated {len(history)} posting records to {record_file.name}")
 
 
 def main():
@@ -311,10 +488,13 @@ def main():
 
     use_ai = not args.no_ai
 
-    if args.auto:
-        bot.generate_and_post(auto_post=True, use_ai=use_ai)
-    else:
-        bot.generate_and_post(auto_post=False, use_ai=use_ai)
+    try:
+        if args.auto:
+            bot.generate_and_post(auto_post=True, use_ai=use_ai)
+        else:
+            bot.generate_and_post(auto_post=False, use_ai=use_ai)
+    finally:
+        bot.close()
 
 
 if __name__ == "__main__":